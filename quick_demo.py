@@ -5,49 +5,98 @@ A simple demonstration of the RPP News Retrieval System
 
 import sys
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from rss_parser import fetch_rpp_news
-from tokenization import analyze_corpus_tokens
+from rss_parser import iter_rpp_news_batches
+from tokenization import analyze_corpus_tokens, get_tokenizer_from_model
 from embeddings import NewsEmbedder
 from retrieval import NewsRetriever
 
+RSS_URLS = ["https://rpp.pe/rss"]
+RSS_META_PATH = "./data/.rss_meta.json"
+
+async def fetch_stage(rss_urls, max_items, batch_size, articles_queue):
+    """Fetch all feeds concurrently, queueing each batch as soon as the parser fills it"""
+    loop = asyncio.get_running_loop()
+    
+    def fetch_feed(rss_url):
+        # Runs in a worker thread: the download and parse continue while earlier
+        # batches are embedded, and a full queue pauses the parser
+        for batch in iter_rpp_news_batches(rss_url, max_items, batch_size, meta_path=RSS_META_PATH):
+            asyncio.run_coroutine_threadsafe(articles_queue.put(batch), loop).result()
+    
+    await asyncio.gather(*(loop.run_in_executor(None, fetch_feed, rss_url) for rss_url in rss_urls))
+    await articles_queue.put(None)
+
+async def embed_stage(embedder, articles_queue, embedded_queue):
+    """Embed each batch as soon as it has been fetched"""
+    loop = asyncio.get_running_loop()
+    while (batch := await articles_queue.get()) is not None:
+        embedded_batch = await loop.run_in_executor(None, embedder.embed_articles, batch)
+        await embedded_queue.put(embedded_batch)
+    await embedded_queue.put(None)
+
+async def store_stage(retriever, embedded_queue, write_executor):
+    """Hand embedded batches to the ChromaDB writer thread without waiting on them"""
+    stored_articles = []
+    pending_writes = []
+    while (embedded_batch := await embedded_queue.get()) is not None:
+        pending_writes.append(write_executor.submit(retriever.add_documents, embedded_batch))
+        stored_articles.extend(embedded_batch.metadatas)
+    return stored_articles, pending_writes
+
+async def ingest(embedder, retriever, write_executor, max_items):
+    """Run fetch → embed → store as overlapping stages"""
+    articles_queue = asyncio.Queue(maxsize=4)
+    embedded_queue = asyncio.Queue(maxsize=4)
+    _, _, (stored_articles, pending_writes) = await asyncio.gather(
+        # Batches match the embedder's encode batch size, so each one is a full forward pass
+        fetch_stage(RSS_URLS, max_items, embedder.batch_size, articles_queue),
+        embed_stage(embedder, articles_queue, embedded_queue),
+        store_stage(retriever, embedded_queue, write_executor)
+    )
+    return stored_articles, pending_writes
+
 def main():
     print("="*70)
     print("RPP NEWS RETRIEVAL SYSTEM - QUICK DEMO")
     print("="*70)
     
-    # Step 1: Fetch articles
-    print("\n[1/5] Fetching RSS feed from RPP...")
-    articles = fetch_rpp_news(max_items=10)  # Use only 10 for quick demo
-    print(f"✅ Fetched {len(articles)} articles")
-    
-    # Step 2: Analyze tokens
-    print("\n[2/5] Analyzing token counts...")
-    corpus_stats = analyze_corpus_tokens(articles)
-    print(f"✅ Average tokens per article: {corpus_stats['avg_tokens']:.2f}")
-    
-    # Step 3: Generate embeddings
-    print("\n[3/5] Generating embeddings...")
-    embedder = NewsEmbedder()
-    embedded_articles = embedder.embed_articles(articles)
-    print(f"✅ Generated embeddings for {len(embedded_articles)} articles")
-    
-    # Step 4: Store in ChromaDB
-    print("\n[4/5] Storing in ChromaDB...")
+    # Step 1: Load models and storage
+    print("\n[1/4] Loading embedding model and ChromaDB...")
+    embedder = NewsEmbedder(cache_dir="./data/embedding_cache")
     retriever = NewsRetriever(
         collection_name="rpp_news_demo",
         persist_directory="./data/chromadb_demo"
     )
-    retriever.add_documents(embedded_articles)
-    print(f"✅ Stored {len(embedded_articles)} documents")
     
-    # Step 5: Query
-    print("\n[5/5] Querying the database...")
+    # Step 2: Fetch, embed and store in overlapping stages; ChromaDB writes
+    # keep running in the background until the query needs them
+    print("\n[2/4] Fetching, embedding and storing RSS articles from RPP...")
+    write_executor = ThreadPoolExecutor(max_workers=1)
+    stored_articles, pending_writes = asyncio.run(
+        ingest(embedder, retriever, write_executor, max_items=10)  # Use only 10 for quick demo
+    )
+    print(f"✅ Fetched and embedded {len(stored_articles)} articles")
+    
+    # Step 3: Analyze tokens
+    print("\n[3/4] Analyzing token counts...")
+    corpus_stats = analyze_corpus_tokens(stored_articles, tokenizer=get_tokenizer_from_model(embedder))
+    print(f"✅ Average tokens per article: {corpus_stats['avg_tokens']:.2f}")
+    
+    # Step 4: Query
+    print("\n[4/4] Querying the database...")
     query = "Últimas noticias de economía"
-    results_df = retriever.query_to_dataframe(query, n_results=3, embedder=embedder)
+    query_embedding = embedder.embed_text(query)
+    for write in pending_writes:
+        write.result()
+    write_executor.shutdown()
+    print(f"✅ Stored {len(stored_articles)} documents")
+    results_df = retriever.query_to_dataframe(query, n_results=3, query_embedding=query_embedding)
     
     print(f"\n🔍 Query: '{query}'")
     print("\n📋 Top 3 Results:\n")
@@ -55,7 +55,7 @@ def test_dependencies():
     print("\nTesting dependencies...")
     
     dependencies = [
-        'feedparser',
+        'lxml',
         'tiktoken',
         'sentence_transformers',
         'chromadb',
@@ -74,6 +74,16 @@ def test_dependencies():
             print(f"❌ {dep} NOT installed")
             all_ok = False
     
+    # add_documents hands NumPy embedding matrices straight to upsert,
+    # which chromadb only accepts from 1.0.0 on
+    try:
+        import chromadb
+        if int(chromadb.__version__.split('.')[0]) < 1:
+            print(f"❌ chromadb {chromadb.__version__} is too old (need >=1.0.0)")
+            all_ok = False
+    except ImportError:
+        pass
+    
     return all_ok
 
 def main():